@@ -1,21 +1,26 @@
 import os
-import json
+import orjson
 import asyncio
 import re
+import hashlib
+import queue
+import atexit
 import logging
-import requests                     
-from typing import Optional, Dict, Any, List  
-from typing import Optional, Dict, Any
+import logging.handlers
+import httpx
+from typing import Optional, Dict, Any, List
 from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from prometheus_client import make_asgi_app
 from dotenv import load_dotenv
 import openai
+from openai import AsyncOpenAI
 
 # Local imports
 from models.flight_models import FlightQuery
-from tools.base_tool import call_mcp_search
-from redis_memory import append_message, get_history
-from intent_parser import parse_user_query
+from tools.base_tool import call_mcp_search_many, close_client, aclose_async_client
+from redis_memory import append_messages, get_history, r as redis_cache
+from intent_parser import parse_user_query, detect_currency_from_text
 
 
 
@@ -26,7 +31,7 @@ from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
 from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
-from opentelemetry.instrumentation.requests import RequestsInstrumentor
+from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
 from tools.mcp_tool import aggregate_flight_search_tool
 from langchain.agents import initialize_agent, AgentType
 from langchain_openai import ChatOpenAI
@@ -38,6 +43,9 @@ from langchain_openai import ChatOpenAI
 load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY", "")
 
+# Async OpenAI client so completions don't block the event loop
+_oai = AsyncOpenAI(api_key=openai.api_key)
+
 
 # Initialize the LLM (GPT model)
 llm = ChatOpenAI(
@@ -53,7 +61,7 @@ tools = [aggregate_flight_search_tool]
 agent = initialize_agent(
     tools=tools,
     llm=llm,
-    agent_type=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+    agent=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
     verbose=True,
 )
 
@@ -67,62 +75,129 @@ if otel_endpoint:
     provider.add_span_processor(BatchSpanProcessor(exporter))
     trace.set_tracer_provider(provider)
     FastAPIInstrumentor().instrument()
-    RequestsInstrumentor().instrument()
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    handlers=[
-        logging.FileHandler("orchestrator.log"),
-        logging.StreamHandler()
-    ]
-)
+    HTTPXClientInstrumentor().instrument()
+
+# Request paths only enqueue log records; file/console I/O happens on the listener thread
+_log_formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+_log_handlers = [
+    logging.handlers.RotatingFileHandler("orchestrator.log", maxBytes=10_000_000, backupCount=3),
+    logging.StreamHandler(),
+]
+for _h in _log_handlers:
+    _h.setFormatter(_log_formatter)
+
+_log_queue = queue.Queue(-1)
+# The QueueHandler only merges args into the message; the listener's handlers apply _log_formatter
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+logging.getLogger().addHandler(_queue_handler)
+logging.getLogger().setLevel(logging.INFO)
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logger = logging.getLogger("orchestrator")
 
 
 
 # --- FastAPI app ---
-app = FastAPI(title="LangChain Flight Orchestrator")
+app = FastAPI(title="LangChain Flight Orchestrator", default_response_class=ORJSONResponse)
+app.mount("/metrics", make_asgi_app())
 
 @app.get("/")
 def root():
     return {"status": "ok", "service": "orchestrator"}
 
 
+def dumps(obj: Any) -> str:
+    """Serialize to a JSON string with orjson (for Redis payloads and prompts)."""
+    return orjson.dumps(obj).decode()
+
+
 _EXCHANGE_RATES = {}
 try:
-    _EXCHANGE_RATES = json.loads(os.getenv("EXCHANGE_RATES", "{}"))
+    _EXCHANGE_RATES = orjson.loads(os.getenv("EXCHANGE_RATES", "{}"))
 except Exception:
     _EXCHANGE_RATES = {}
 
-def detect_region_from_ip(ip_address: Optional[str]) -> Dict[str, Any]:
+# Precomputed (from, to) -> multiplier so a conversion is a single multiply.
+# Rates are per-unit relative to a "base currency" (e.g., INR:1.0), so from->to is rate[to] / rate[from].
+_RATE_MATRIX: Dict[tuple, float] = {}
+try:
+    _RATE_MATRIX = {
+        (a, b): float(rb) / float(ra)
+        for a, ra in _EXCHANGE_RATES.items()
+        for b, rb in _EXCHANGE_RATES.items()
+        if ra
+    }
+except Exception:
+    _RATE_MATRIX = {}
+
+# Pooled keep-alive client for the IP geolocation provider (closed on shutdown)
+_geo_client = httpx.AsyncClient(timeout=3.0, limits=httpx.Limits(max_keepalive_connections=20))
+
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    await _geo_client.aclose()
+    await aclose_async_client()
+    close_client()
+
+
+# IP -> region cache. Bump the version prefix to invalidate all entries at once.
+GEO_CACHE_PREFIX = "v1:geo:ip"
+GEO_CACHE_TTL = 60 * 60 * 24          # successful lookups: 24h
+GEO_NEGATIVE_CACHE_TTL = 60 * 5       # failed lookups: 5 min, so provider outages aren't hammered
+
+
+def _default_region() -> Dict[str, Any]:
+    return {"country": "IN", "currency": "INR", "region": "IN"}
+
+
+async def detect_region_from_ip(ip_address: Optional[str]) -> Dict[str, Any]:
     """
     Attempt to detect a single region dict from client IP.
     Returns a dict like: {"country": "IN", "currency": "INR", "region": "Asia/India"}.
     If an external IP geolocation provider is configured via env var IP_GEO_PROVIDER,
     it will call it (simple GET JSON with keys 'country' and 'currency' expected).
+    Lookups are cached in Redis per IP (24h, or 5 min for failed lookups).
     Otherwise returns a safe default.
     """
     if not ip_address:
-        return {"country": "IN", "currency": "INR", "region": "IN"}
+        return _default_region()
 
     provider = os.getenv("IP_GEO_PROVIDER", "").strip()
+    if not provider:
+        return _default_region()
+
+    cache_key = f"{GEO_CACHE_PREFIX}:{ip_address}"
+    try:
+        cached = redis_cache.get(cache_key)
+        if cached:
+            return orjson.loads(cached)
+    except Exception as e:
+        logger.warning("Region cache lookup failed: %s", e)
+
+    region, ttl = _default_region(), GEO_NEGATIVE_CACHE_TTL
     try:
-        if provider:
-            # expected format: provider URL with {ip} placeholder, e.g. "https://ipapi.co/{ip}/json"
-            url = provider.format(ip=ip_address)
-            resp = requests.get(url, timeout=3)
-            if resp.status_code == 200:
-                data = resp.json()
-                country = data.get("country", data.get("country_code", "IN"))
-                # many providers call currency "currency" or "currency_code"
-                currency = data.get("currency", data.get("currency_code", "INR"))
-                return {"country": country, "currency": currency, "region": country}
+        # expected format: provider URL with {ip} placeholder, e.g. "https://ipapi.co/{ip}/json"
+        url = provider.format(ip=ip_address)
+        resp = await _geo_client.get(url)
+        if resp.status_code == 200:
+            data = orjson.loads(resp.content)
+            country = data.get("country", data.get("country_code", "IN"))
+            # many providers call currency "currency" or "currency_code"
+            currency = data.get("currency", data.get("currency_code", "INR"))
+            region, ttl = {"country": country, "currency": currency, "region": country}, GEO_CACHE_TTL
     except Exception as e:
         logger.warning("Region detection via IP provider failed: %s", e)
 
-    # fallback
-    return {"country": "IN", "currency": "INR", "region": "IN"}
+    try:
+        redis_cache.setex(cache_key, ttl, orjson.dumps(region))
+    except Exception as e:
+        logger.warning("Region cache write failed: %s", e)
+
+    return region
 
 
 def normalize_price(amount: float, from_currency: str, to_currency: str) -> Optional[float]:
@@ -131,56 +206,99 @@ def normalize_price(amount: float, from_currency: str, to_currency: str) -> Opti
     If rates incomplete, return None (indicates cannot normalize).
     Rates are expected as: EXCHANGE_RATES={"INR":1.0,"USD":0.012,...}
     """
-    if not _EXCHANGE_RATES:
+    if not _RATE_MATRIX:
         return None
+    if from_currency == to_currency:
+        return amount
     try:
-        if from_currency == to_currency:
-            return amount
-        base_rate = _EXCHANGE_RATES.get(from_currency)
-        target_rate = _EXCHANGE_RATES.get(to_currency)
-        if base_rate is None or target_rate is None:
-            return None
-        # Convert amount -> base USD-like unit using base_rate, then to target
-        # Here base_rate is assumed as per-unit relative to "base currency" (e.g., INR:1.0)
-        normalized = (amount / base_rate) * target_rate
-        return normalized
-    except Exception:
+        return amount * _RATE_MATRIX[(from_currency, to_currency)]
+    except (KeyError, TypeError):
         return None
 
 
+def normalize_prices(results: List[Dict[str, Any]], display_currency: str) -> None:
+    """
+    Apply normalize_price to a whole result list.
+    Sets '_price_normalized' (rounded to 2dp) and '_display_currency' in place on every
+    result whose price can be converted; rows with a missing or non-numeric price are skipped.
+    """
+    if not _RATE_MATRIX:
+        return
+    for r in results:
+        # a missing price stays None (not 0.0), so it can't sort first as "cheapest"
+        normalized = normalize_price(r.get("price"), r.get("currency", ""), display_currency)
+        if isinstance(normalized, (int, float)):
+            r["_price_normalized"] = round(normalized, 2)
+            r["_display_currency"] = display_currency
+
+
 
 def merge_and_dedupe_results(all_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Merge lists from multiple regions:
       - Deduplicate using providerFlightId if present
       - If no providerFlightId, dedupe by (provider, origin, destination, departureTime, price)
-    Keeps the earliest occurrence and appends a 'region_sources' list to each result with regions that found it.
+    Keeps the earliest occurrence and adds a 'region_sources' list to each result with regions that found it.
+    Results are updated in place (not copied); callers pass freshly fetched MCP results.
     """
     seen = {}
     merged = []
     for r in all_results:
-        try:
-            pid = r.get("providerFlightId")
-            if pid:
-                key = f"pid::{r.get('provider')}::{pid}"
-            else:
-                key = f"anon::{r.get('provider')}::{r.get('origin')}::{r.get('destination')}::{r.get('departureTime')}::{r.get('price')}"
-            if key in seen:
-                existing = seen[key]
-                src = r.get("region_source")
-                if src and src not in existing.get("region_sources", []):
-                    existing["region_sources"].append(src)
-            else:
-                r_copy = dict(r)
-                r_copy["region_sources"] = [r.get("region_source")] if r.get("region_source") else []
-                merged.append(r_copy)
-                seen[key] = r_copy
-        except Exception:
-            # defensive: if malformed result skip it
+        # defensive: skip malformed results
+        if not isinstance(r, dict):
             continue
+        get = r.get
+        provider = get("provider")
+        pid = get("providerFlightId")
+        if pid:
+            key = ("pid", provider, pid)
+        else:
+            key = ("anon", provider, get("origin"), get("destination"), get("departureTime"), get("price"))
+        # region sources are collected in an insertion-ordered dict (ordered set)
+        sources = seen.get(key)
+        if sources is None:
+            sources = seen[key] = {}
+            r["region_sources"] = sources
+            merged.append(r)
+        src = get("region_source")
+        if src:
+            sources[src] = None
+    for m in merged:
+        m["region_sources"] = list(m["region_sources"])
     return merged
 
 
+async def search_regions(
+    parsed: Dict[str, Any],
+    regions: List[Dict[str, Any]],
+    currency_override: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Query MCP once per region, concurrently, and return the combined results.
+    Wall-clock latency is the slowest region instead of the sum of all regions.
+    Each result is tagged with 'region_source'. A failing region is logged and contributes no results.
+    """
+    queries = []
+    for reg in regions:
+        # determine currency precedence: user text override > region currency > parsed currency > default IN
+        fq_payload = dict(parsed)  # shallow copy
+        fq_payload["currency"] = currency_override or reg.get("currency") or parsed.get("currency") or "INR"
+        logger.info("Calling MCP for region %s with currency %s", reg.get("region"), fq_payload["currency"])
+        queries.append(fq_payload)
+
+    pairs = await call_mcp_search_many(queries, return_exceptions=True)
+
+    aggregated_results = []
+    for reg, results in zip(regions, pairs):
+        if isinstance(results, BaseException):
+            logger.warning("MCP call failed for region %s: %s", reg.get("region"), results)
+            continue
+        # tag each result with region
+        region_source = reg.get("region") or reg.get("country") or "unknown"
+        for r in results:
+            r["region_source"] = region_source
+            aggregated_results.append(r)
+    return aggregated_results
 
 
 
@@ -225,35 +343,14 @@ def merge_and_dedupe_results(all_results: List[Dict[str, Any]]) -> List[Dict[str
 #             if device.get("country") or device.get("currency"):
 #                 regions.append({"country": device.get("country"), "currency": device.get("currency"), "region": device.get("region")})
 #             else:
-#                 regions.append(detect_region_from_ip(ip_address))
-
-#         # For each region, build a query copy with currency set and call MCP
-#         aggregated_results = []
-#         for reg in regions:
-#             # determine currency precedence: user text override > region currency > parsed currency > default IN
-#             currency_override = detect_currency_from_text(text)
-#             currency = currency_override or reg.get("currency") or parsed.get("currency") or "INR"
-
-#             # build FlightQuery payload
-#             fq_payload = dict(parsed)  # shallow copy
-#             fq_payload["currency"] = currency
-
-#             # ensure required fields exist (origin/destination must be present from parsed or we raise)
-#             if not fq_payload.get("origin") or not fq_payload.get("destination"):
-#                 raise OrchestratorException("origin/destination missing in parsed query", code="INVALID_QUERY", status_code=400)
-
-#             # call MCP
-#             logger.info("Calling MCP for region %s with currency %s", reg.get("region"), currency)
-#             try:
-#                 results = call_mcp_search(fq_payload)
-#             except Exception as e:
-#                 logger.warning("MCP call failed for region %s: %s", reg.get("region"), e)
-#                 results = []
-
-#             # tag each result with region
-#             for r in results:
-#                 r["region_source"] = reg.get("region") or reg.get("country") or "unknown"
-#                 aggregated_results.append(r)
+#                 regions.append(await detect_region_from_ip(ip_address))
+
+#         # ensure required fields exist (origin/destination must be present from parsed or we raise)
+#         if not parsed.get("origin") or not parsed.get("destination"):
+#             raise OrchestratorException("origin/destination missing in parsed query", code="INVALID_QUERY", status_code=400)
+
+#         # Query MCP for all regions concurrently (currency set per region)
+#         aggregated_results = await search_regions(parsed, regions, detect_currency_from_text(text))
 
 #         # Merge & dedupe
 #         merged = merge_and_dedupe_results(aggregated_results)
@@ -261,14 +358,7 @@ def merge_and_dedupe_results(all_results: List[Dict[str, Any]]) -> List[Dict[str
 #         # Optionally normalize prices to user's preferred currency (if env var USER_DISPLAY_CURRENCY set)
 #         display_currency = parsed.get("currency") or os.getenv("USER_DISPLAY_CURRENCY")
 #         if display_currency:
-#             for r in merged:
-#                 try:
-#                     normalized = normalize_price(r.get("price", 0.0), r.get("currency", ""), display_currency)
-#                     if normalized is not None:
-#                         r["_price_normalized"] = round(normalized, 2)
-#                         r["_display_currency"] = display_currency
-#                 except Exception:
-#                     pass
+#             normalize_prices(merged, display_currency)
 
 #             # sort by normalized price if available else raw price
 #             merged.sort(key=lambda x: x.get("_price_normalized", x.get("price", float('inf'))))
@@ -279,17 +369,16 @@ def merge_and_dedupe_results(all_results: List[Dict[str, Any]]) -> List[Dict[str
 #         summary_prompt = (
 #             f"User asked: '{text}'\n"
 #             f"Regions queried: {[r.get('region_source') for r in merged]}\n"
-#             f"Aggregated flight results: {json.dumps(merged)[:5000]}\n"  # truncate large payload for prompt safety
+#             f"Aggregated flight results: {dumps(merged)[:5000]}\n"  # truncate large payload for prompt safety
 #             f"Summarize top {parsed.get('limit', 10)} flights and mention region & currency."
 #         )
-#         summary = call_openai_sync(summary_prompt)
+#         summary = await call_openai_async(summary_prompt)
 
 #         # session persistence
 #         if session_id:
-#             append_message(session_id, "user", text)
-#             append_message(session_id, "assistant", summary)
+#             append_messages(session_id, [("user", text), ("assistant", summary)])
 
-#         return JSONResponse({
+#         return ORJSONResponse({
 #             "status": "ok",
 #             "parsed_query": parsed,
 #             "regions": regions,
@@ -344,22 +433,31 @@ async def handle_text_query(payload: Dict[str, Any], session_id: Optional[str] =
 
         messages.append({"role": "user", "content": text})
 
-        logger.info(f"🧠 LLM analyzing: {text}")
-        logger.debug(f"💬 Context sent to LLM: {messages}")
+        logger.info("🧠 LLM analyzing: %s", text)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("💬 Context sent to LLM: %s", messages)
 
         #  Invoke the LangChain agent with full memory
-        llm_response = agent.invoke({"input": messages})
-
-        summary_prompt = f"Summarize this in 2 lines for a user interface: {llm_response}"
-        summary = call_openai_sync(summary_prompt)
+        llm_response = await agent.ainvoke({"input": messages})
+
+        # Skip OpenAI when the agent produced nothing; identical outputs reuse a cached summary
+        output = llm_response.get("output") if isinstance(llm_response, dict) else llm_response
+        if not output:
+            summary = NO_RESULTS_SUMMARY
+        else:
+            summary_prompt = f"Summarize this in 2 lines for a user interface: {llm_response}"
+            summary = await call_openai_async(
+                summary_prompt,
+                cache_key=_result_summary_key("query", output),
+                cache_ttl=RESULT_SUMMARY_CACHE_TTL,
+            )
 
         #  Store the new conversation turn in Redis
         if session_id:
-            append_message(session_id, "user", text)
-            append_message(session_id, "assistant", llm_response)
+            append_messages(session_id, [("user", text), ("assistant", llm_response)])
 
         #  Return response
-        return JSONResponse({
+        return ORJSONResponse({
             "status": "ok",
             "response": llm_response,
             "session_id": session_id,
@@ -380,29 +478,6 @@ async def handle_text_query(payload: Dict[str, Any], session_id: Optional[str] =
 
 
 
-def append_message(session_id: str, role: str, content: str):
-    redis_client.rpush(session_id, json.dumps({"role": role, "content": content}))
-
-def get_history(session_id: str):
-    messages = redis_client.lrange(session_id, 0, -1)
-    return [json.loads(m.decode('utf-8')) for m in messages]
-
-
-
-def detect_currency_from_text(text: str):
-    text = text.lower()
-    currencies = {
-        "usd": "USD", "inr": "INR", "euro": "EUR", "eur": "EUR",
-        "pound": "GBP", "gbp": "GBP", "aed": "AED", "dirham": "AED"
-    }
-    for k, v in currencies.items():
-        if k in text:
-            return v
-    return None
-
-
-
-
 # 🧩 2. Structured (non-stream) search
 @app.post("/agent/search")
 async def orchestrate_search(query: FlightQuery, session_id: Optional[str] = Query(None)):
@@ -411,23 +486,28 @@ async def orchestrate_search(query: FlightQuery, session_id: Optional[str] = Que
     Uses the same LangChain tool internally to call MCP.
     """
     try:
-        if session_id:
-            append_message(session_id, "user", json.dumps(query.dict()))
-
         # 🧩 Use the LangChain Tool instead of direct MCP call
-        results = aggregate_flight_search_tool.invoke(query.dict())
-
-        if session_id:
-            append_message(session_id, "assistant", json.dumps(results))
-
-        # Summarize results with OpenAI
-        summary_prompt = f"Summarize Amadeus flight results in 2 lines for the UI: {results}"
-        summary = call_openai_sync(summary_prompt)
+        results = await aggregate_flight_search_tool.ainvoke(query.dict())
+
+        # Summarize results with OpenAI (skipped for empty results, cached per result set)
+        if not results:
+            summary = NO_RESULTS_SUMMARY
+        else:
+            summary_prompt = f"Summarize Amadeus flight results in 2 lines for the UI: {results}"
+            summary = await call_openai_async(
+                summary_prompt,
+                cache_key=_result_summary_key("search", results),
+                cache_ttl=RESULT_SUMMARY_CACHE_TTL,
+            )
 
         if session_id:
-            append_message(session_id, "assistant", summary)
+            append_messages(session_id, [
+                ("user", dumps(query.dict())),
+                ("assistant", dumps(results)),
+                ("assistant", summary),
+            ])
 
-        return JSONResponse({
+        return ORJSONResponse({
             "status": "ok",
             "results": results,
             "summary": summary
@@ -462,26 +542,24 @@ async def orchestrate_search_stream(query: FlightQuery, session_id: Optional[str
                 status_code=500
             )
 
-        # 🧩 Use the LangChain Tool for flight search
-        results = aggregate_flight_search_tool.invoke(query.dict())
+        # 🧩 Use the LangChain Tool for flight search (async, so open streams keep flowing)
+        results = await aggregate_flight_search_tool.ainvoke(query.dict())
         prompt = f"Stream a short summary for these Amadeus flight results: {results}"
 
         async def event_generator():
             try:
-                stream = openai.ChatCompletion.create(
+                stream = await _oai.chat.completions.create(
                     model="gpt-4o-mini",
                     messages=[{"role": "user", "content": prompt}],
                     stream=True,
                     temperature=0.0
                 )
 
-                for event in stream:
-                    if isinstance(event, dict) and event.get("choices"):
-                        for ch in event["choices"]:
-                            delta = ch.get("delta", {})
-                            token = delta.get("content") or delta.get("text")
-                            if token:
-                                yield f"data: {token}\n\n"
+                async for chunk in stream:
+                    for ch in chunk.choices:
+                        token = ch.delta.content
+                        if token:
+                            yield f"data: {token}\n\n"
 
                 yield "data: [DONE]\n\n"
 
@@ -492,8 +570,10 @@ async def orchestrate_search_stream(query: FlightQuery, session_id: Optional[str
 
         # Session persistence
         if session_id:
-            append_message(session_id, "user", json.dumps(query.dict()))
-            append_message(session_id, "assistant", "[Streaming started]")
+            append_messages(session_id, [
+                ("user", dumps(query.dict())),
+                ("assistant", "[Streaming started]"),
+            ])
 
         return StreamingResponse(event_generator(), media_type="text/event-stream")
 
@@ -512,9 +592,54 @@ async def orchestrate_search_stream(query: FlightQuery, session_id: Optional[str
 
 
 # --- Utility function for OpenAI calls ---
-def call_openai_sync(prompt: str) -> str:
+# Summaries are memoized in Redis by prompt hash; the lock key lets a single caller
+# refresh a cold entry while concurrent callers wait for its result.
+SUMMARY_CACHE_PREFIX = "v1:openai:sum"
+SUMMARY_CACHE_TTL = int(os.getenv("SUMMARY_CACHE_TTL", "3600"))
+SUMMARY_LOCK_TTL = 5
+
+# Summaries keyed by a hash of the summarized payload itself, so repeated result sets
+# reuse one summary even when the surrounding prompt differs.
+RESULT_SUMMARY_CACHE_PREFIX = "v1:sum"
+RESULT_SUMMARY_CACHE_TTL = 60 * 60 * 24
+NO_RESULTS_SUMMARY = "No flights found."
+
+
+def _result_summary_key(kind: str, payload: Any) -> str:
+    digest = hashlib.blake2b(orjson.dumps(payload, default=str), digest_size=16).hexdigest()
+    return f"{RESULT_SUMMARY_CACHE_PREFIX}:{kind}:{digest}"
+
+
+def _summary_cache_get(key: str) -> Optional[str]:
+    try:
+        return redis_cache.get(key)
+    except Exception as e:
+        logger.warning("Summary cache lookup failed: %s", e)
+        return None
+
+
+async def _wait_for_summary(key: str) -> Optional[str]:
+    """Poll for a summary another caller is computing, up to the lock TTL."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + SUMMARY_LOCK_TTL
+    while loop.time() < deadline:
+        await asyncio.sleep(0.1)
+        # the Redis client is synchronous; keep the poll off the event loop
+        cached = await asyncio.to_thread(_summary_cache_get, key)
+        if cached is not None:
+            return cached
+    return None
+
+
+async def call_openai_async(
+    prompt: str,
+    cache_key: Optional[str] = None,
+    cache_ttl: int = SUMMARY_CACHE_TTL,
+) -> str:
     """
-    Calls OpenAI synchronously. Raises OrchestratorException if key missing or API fails.
+    Calls OpenAI without blocking the event loop, memoized in Redis for cache_ttl seconds
+    under cache_key (default: sha256 of the prompt).
+    Raises OrchestratorException if key missing or API fails.
     """
     if not openai.api_key:
         raise OrchestratorException(
@@ -523,23 +648,56 @@ def call_openai_sync(prompt: str) -> str:
             status_code=500
         )
 
+    if cache_key is None:
+        cache_key = f"{SUMMARY_CACHE_PREFIX}:{hashlib.sha256(prompt.encode()).hexdigest()}"
+    cached = _summary_cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    lock_key = f"{cache_key}:lock"
     try:
-        resp = openai.ChatCompletion.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.0,
-            max_tokens=200
-        )
-        return resp["choices"][0]["message"]["content"]
-    except Exception as e:
-        logger.exception("OpenAI API call failed: %s", e)
-        raise OrchestratorException(
-            f"OpenAI API error: {str(e)}",
-            code="OPENAI_API_ERROR",
-            status_code=502
-        )
+        has_lock = bool(redis_cache.set(lock_key, "1", nx=True, ex=SUMMARY_LOCK_TTL))
+    except Exception:
+        has_lock = True
+    if not has_lock:
+        cached = await _wait_for_summary(cache_key)
+        if cached is not None:
+            return cached
+        # lock holder failed or is too slow — compute it ourselves
+
+    try:
+        try:
+            resp = await _oai.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.0,
+                max_tokens=200
+            )
+            content = resp.choices[0].message.content
+        except Exception as e:
+            logger.exception("OpenAI API call failed: %s", e)
+            raise OrchestratorException(
+                f"OpenAI API error: {str(e)}",
+                code="OPENAI_API_ERROR",
+                status_code=502
+            )
+
+        if content is not None:
+            try:
+                redis_cache.setex(cache_key, cache_ttl, content)
+            except Exception as e:
+                logger.warning("Summary cache write failed: %s", e)
+    finally:
+        # release even on failure so waiters don't sit out the full lock TTL
+        if has_lock:
+            try:
+                redis_cache.delete(lock_key)
+            except Exception as e:
+                logger.warning("Summary lock release failed: %s", e)
+
+    return content
+
 
-    
 
 
 # --- Global Exception Handling Setup ---
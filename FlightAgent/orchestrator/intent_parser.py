@@ -1,6 +1,7 @@
 import re
+from functools import lru_cache
 from datetime import date, timedelta, datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 # Mapping for simple weekday recognition
 WEEKDAYS = {
@@ -8,102 +9,168 @@ WEEKDAYS = {
     "thursday": 3, "friday": 4, "saturday": 5, "sunday": 6
 }
 
+AIRLINES = ["emirates", "air india", "indigo", "qatar", "lufthansa", "spicejet"]
+
+CURRENCIES = {
+    "usd": "USD", "inr": "INR", "euro": "EUR", "eur": "EUR",
+    "pound": "GBP", "gbp": "GBP", "aed": "AED", "dirham": "AED"
+}
+
+# Patterns are compiled once at import. Keyword lists whose precedence depends on list
+# order (weekdays, airlines, currencies) stay plain substring loops.
+_PAT_FROM_TO = re.compile(r"from ([a-z\s]+) to ([a-z\s]+)")
+_PAT_ON_DATE = re.compile(r"on (\d{1,2})(?:st|nd|rd|th)? (\w+)")
+_PAT_BETWEEN = re.compile(r"between ?₹?(\d+) and ?₹?(\d+)")
+_PAT_MAX_PRICE = re.compile(r"(?:under|below) ?₹?(\d+)")
+_PAT_MIN_PRICE = re.compile(r"(?:above|over) ?₹?(\d+)")
+_PAT_AFTER = re.compile(r"after (\d{1,2})(?:[:\.](\d{2}))?\s*(am|pm)?")
+_PAT_BEFORE = re.compile(r"before (\d{1,2})(?:[:\.](\d{2}))?\s*(am|pm)?")
+_PAT_NONSTOP = re.compile(r"non-?stop|direct")
+_PAT_ONE_STOP = re.compile(r"1-stop|one stop")
+_PAT_CHEAP = re.compile(r"cheap|lowest|affordable")
+_PAT_LIMIT = re.compile(r"(\d+)\s*(cheapest|flights)")
+
+
+def _hour_from_match(m: re.Match) -> int:
+    hour = int(m.group(1))
+    if m.group(3) == "pm" and hour < 12:
+        hour += 12
+    return hour
+
+
+def detect_currency_from_text(text: str) -> Optional[str]:
+    """Return the ISO currency code mentioned in the text (e.g. "usd", "dirham"), if any."""
+    text = text.lower()
+    for k, v in CURRENCIES.items():
+        if k in text:
+            return v
+    return None
+
+
 def parse_user_query(text: str) -> Dict:
     """
     Enhanced natural language parser for flight queries.
     Extracts origin, destination, dates, price range, airlines, time filters, and intent.
     Returns a dict usable directly for FlightQuery.
+    The text-only pass is memoized on whitespace-normalized text; relative dates are
+    resolved against today's date on every call.
+    """
+    text_norm = " ".join(text.lower().split())
+    query = dict(_parse_text_only(text_norm))
+    _resolve_relative_date(query, date.today())
+    return query
+
+
+def _resolve_relative_date(query: Dict, today: date) -> None:
+    """Replace the date tokens left by _parse_text_only with concrete ISO dates, in place."""
+    rel_date = query.pop("_rel_date", None)
+    weekday = query.pop("_weekday", None)
+    on_date = query.pop("_on_date", None)
+    round_trip = query.pop("_round_trip", False)
+
+    if rel_date == "today":
+        query["departDate"] = today.isoformat()
+    elif rel_date == "tomorrow":
+        query["departDate"] = (today + timedelta(days=1)).isoformat()
+    elif rel_date == "next_weekend":
+        # Next Saturday as depart, Sunday as return
+        days_ahead = (5 - today.weekday()) % 7  # Saturday
+        depart = today + timedelta(days=days_ahead)
+        ret = depart + timedelta(days=1)
+        query["departDate"] = depart.isoformat()
+        query["returnDate"] = ret.isoformat()
+    else:
+        if weekday is not None:
+            days_ahead = (weekday - today.weekday()) % 7
+            query["departDate"] = (today + timedelta(days=days_ahead)).isoformat()
+
+        if on_date:
+            try:
+                d, month_str = on_date
+                depart_dt = datetime.strptime(f"{d} {month_str} {today.year}", "%d %B %Y").date()
+                query["departDate"] = depart_dt.isoformat()
+            except Exception:
+                pass
+
+    if round_trip and "returnDate" not in query:
+        # default: +3 days
+        query["returnDate"] = (today + timedelta(days=3)).isoformat()
+
+
+@lru_cache(maxsize=4096)
+def _parse_text_only(text_lower: str) -> Tuple:
+    """
+    Date-independent parse of normalized text. Dates are left as tokens
+    (_rel_date, _weekday, _on_date, _round_trip) for _resolve_relative_date.
     """
-    text_lower = text.lower()
     query: Dict = {}
 
     # --- 1️⃣ Origin & Destination ---
-    m = re.search(r"from ([a-zA-Z\s]+) to ([a-zA-Z\s]+)", text_lower)
+    m = _PAT_FROM_TO.search(text_lower)
     if m:
         query["origin"] = m.group(1).strip().upper()
         query["destination"] = m.group(2).strip().upper()
 
     # --- 2️⃣ Date Handling ---
-    today = date.today()
     if "today" in text_lower:
-        query["departDate"] = today.isoformat()
+        query["_rel_date"] = "today"
     elif "tomorrow" in text_lower:
-        query["departDate"] = (today + timedelta(days=1)).isoformat()
+        query["_rel_date"] = "tomorrow"
     elif "next weekend" in text_lower:
-        # Next Saturday as depart, Sunday as return
-        days_ahead = (5 - today.weekday()) % 7  # Saturday
-        depart = today + timedelta(days=days_ahead)
-        ret = depart + timedelta(days=1)
-        query["departDate"] = depart.isoformat()
-        query["returnDate"] = ret.isoformat()
+        query["_rel_date"] = "next_weekend"
     else:
         # Specific day names e.g. "Monday" or "Tuesday"
         for day_name, weekday_num in WEEKDAYS.items():
             if day_name in text_lower:
-                days_ahead = (weekday_num - today.weekday()) % 7
-                query["departDate"] = (today + timedelta(days=days_ahead)).isoformat()
+                query["_weekday"] = weekday_num
                 break
 
         # Specific calendar date e.g. "on 15th Nov" or "on 20 November"
-        m = re.search(r"on (\d{1,2})(?:st|nd|rd|th)? (\w+)", text_lower)
+        m = _PAT_ON_DATE.search(text_lower)
         if m:
-            try:
-                d = int(m.group(1))
-                month_str = m.group(2)
-                depart_dt = datetime.strptime(f"{d} {month_str} {today.year}", "%d %B %Y").date()
-                query["departDate"] = depart_dt.isoformat()
-            except Exception:
-                pass
+            query["_on_date"] = (int(m.group(1)), m.group(2))
 
     # --- 3️⃣ Round Trip ---
     if "return" in text_lower or "round trip" in text_lower:
-        if "returnDate" not in query:
-            # default: +3 days
-            query["returnDate"] = (today + timedelta(days=3)).isoformat()
+        query["_round_trip"] = True
 
     # --- 4️⃣ Price Range ---
-    m = re.search(r"between ?₹?(\d+) and ?₹?(\d+)", text_lower)
+    m = _PAT_BETWEEN.search(text_lower)
     if m:
         query["minPrice"] = float(m.group(1))
         query["maxPrice"] = float(m.group(2))
         query["intent"] = "price_range"
     elif "under" in text_lower or "below" in text_lower:
-        m = re.search(r"(?:under|below) ?₹?(\d+)", text_lower)
+        m = _PAT_MAX_PRICE.search(text_lower)
         if m:
             query["maxPrice"] = float(m.group(1))
             query["intent"] = "price_range"
     elif "above" in text_lower or "over" in text_lower:
-        m = re.search(r"(?:above|over) ?₹?(\d+)", text_lower)
+        m = _PAT_MIN_PRICE.search(text_lower)
         if m:
             query["minPrice"] = float(m.group(1))
             query["intent"] = "price_range"
 
     # --- 5️⃣ Time filters (after/before specific time) ---
-    m = re.search(r"after (\d{1,2})(?:[:\.](\d{2}))?\s*(am|pm)?", text_lower)
+    m = _PAT_AFTER.search(text_lower)
     if m:
-        hour = int(m.group(1))
-        if m.group(3) == "pm" and hour < 12:
-            hour += 12
-        query["departAfter"] = f"{hour:02d}:00"
-    m = re.search(r"before (\d{1,2})(?:[:\.](\d{2}))?\s*(am|pm)?", text_lower)
+        query["departAfter"] = f"{_hour_from_match(m):02d}:00"
+    m = _PAT_BEFORE.search(text_lower)
     if m:
-        hour = int(m.group(1))
-        if m.group(3) == "pm" and hour < 12:
-            hour += 12
-        query["departBefore"] = f"{hour:02d}:00"
+        query["departBefore"] = f"{_hour_from_match(m):02d}:00"
 
     # --- 6️⃣ Airline preference ---
-    airline_keywords = ["emirates", "air india", "indigo", "qatar", "lufthansa", "spicejet"]
-    for airline in airline_keywords:
+    # no break: the last listed airline mentioned wins
+    for airline in AIRLINES:
         if airline in text_lower:
             query["airline"] = airline.title()
             query["intent"] = "airline_filter"
 
     # --- 7️⃣ Stops ---
-    if "nonstop" in text_lower or "non-stop" in text_lower or "direct" in text_lower:
+    if _PAT_NONSTOP.search(text_lower):
         query["stops"] = 0
         query["intent"] = "direct"
-    elif "1-stop" in text_lower or "one stop" in text_lower:
+    elif _PAT_ONE_STOP.search(text_lower):
         query["stops"] = 1
 
     # --- 8️⃣ Cabin ---
@@ -117,15 +184,15 @@ def parse_user_query(text: str) -> Dict:
         query["cabinClass"] = "Economy"
 
     # --- 9️⃣ Multi-day compare ---
-    if "compare" in text_lower and any(day in text_lower for day in WEEKDAYS.keys()):
+    if "compare" in text_lower and any(day in text_lower for day in WEEKDAYS):
         query["intent"] = "day_compare"
 
     # --- 🔟 Cheap fallback intent ---
-    if "cheap" in text_lower or "lowest" in text_lower or "affordable" in text_lower:
+    if _PAT_CHEAP.search(text_lower):
         query["intent"] = "cheapest"
 
     # --- 1️⃣1️⃣ Numeric limits ---
-    m = re.search(r"(\d+)\s*(cheapest|flights)", text_lower)
+    m = _PAT_LIMIT.search(text_lower)
     if m:
         query["limit"] = int(m.group(1))
 
@@ -133,4 +200,4 @@ def parse_user_query(text: str) -> Dict:
     if "intent" not in query:
         query["intent"] = "cheapest"
 
-    return query
+    return tuple(query.items())
@@ -5,6 +5,7 @@ class FlightQuery(BaseModel):
     origin: str
     destination: str
     departDate: Optional[str] = None
+    returnDate: Optional[str] = None
     passengers: Optional[int] = 1
     cabinClass: Optional[str] = "Economy"
     currency: Optional[str] = "INR"
@@ -12,6 +13,8 @@ class FlightQuery(BaseModel):
     minPrice: Optional[float] = None
     maxPrice: Optional[float] = None
     intent: Optional[str] = "cheapest"
+    airline: Optional[str] = None
+    region: Optional[str] = None
 
     @field_validator("intent", mode="before")
     def validate_intent(cls, v):
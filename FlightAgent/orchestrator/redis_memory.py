@@ -1,22 +1,54 @@
 import os
-import json
+import orjson
 import redis
+from threading import Lock
+from typing import List, Tuple
+from cachetools import TTLCache
 
 REDIS_HOST = os.getenv("REDIS_HOST", "redis")
 REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
 
+HISTORY_TTL = 60 * 60 * 24  # keep 24h by default
+MAX_HISTORY = int(os.getenv("MAX_HISTORY", "40"))  # turns kept per session
+
 r = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=True)
 
+# Short-lived in-process cache for hot sessions; appends in this process invalidate it,
+# other workers may see history up to HISTORY_L1_TTL seconds stale.
+HISTORY_L1_TTL = 5
+_history_l1 = TTLCache(maxsize=10_000, ttl=HISTORY_L1_TTL)
+_history_l1_lock = Lock()
+
 def append_message(session_id: str, role: str, content: str):
+    append_messages(session_id, [(role, content)])
+
+def append_messages(session_id: str, messages: List[Tuple[str, str]]):
+    """
+    Append (role, content) turns, trim to the last MAX_HISTORY and refresh the TTL
+    in a single pipelined round-trip.
+    """
     key = f"session:{session_id}:history"
-    r.rpush(key, json.dumps({"role": role, "content": content}))
-    r.expire(key, 60 * 60 * 24)  # keep 24h by default
+    with r.pipeline(transaction=False) as p:
+        p.rpush(key, *(orjson.dumps({"role": role, "content": content}) for role, content in messages))
+        p.ltrim(key, -MAX_HISTORY, -1)
+        p.expire(key, HISTORY_TTL)
+        p.execute()
+    with _history_l1_lock:
+        _history_l1.pop(session_id, None)
 
 def get_history(session_id: str):
-    key = f"session:{session_id}:history"
-    items = r.lrange(key, 0, -1)
-    return [json.loads(i) for i in items]
+    with _history_l1_lock:
+        history = _history_l1.get(session_id)
+    if history is None:
+        key = f"session:{session_id}:history"
+        items = r.lrange(key, -MAX_HISTORY, -1)
+        history = [orjson.loads(i) for i in items]
+        with _history_l1_lock:
+            _history_l1[session_id] = history
+    return list(history)
 
 def clear_history(session_id: str):
     key = f"session:{session_id}:history"
     r.delete(key)
+    with _history_l1_lock:
+        _history_l1.pop(session_id, None)
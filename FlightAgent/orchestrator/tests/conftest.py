@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modules import each other as top-level names (e.g. `from tools.base_tool import ...`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
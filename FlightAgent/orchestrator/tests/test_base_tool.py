@@ -0,0 +1,136 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pybreaker
+import pytest
+
+from exceptions import OrchestratorException
+from tools import base_tool
+
+
+@pytest.fixture(autouse=True)
+def breaker(monkeypatch):
+    breaker = pybreaker.CircuitBreaker(fail_max=5, reset_timeout=30, exclude=[OrchestratorException])
+    monkeypatch.setattr(base_tool, "_MCP_BREAKER", breaker)
+    return breaker
+
+
+@pytest.fixture
+def no_delay(monkeypatch):
+    """Keep the default retry policy (attempt count, wait callback) but never sleep."""
+    monkeypatch.setattr(base_tool, "_BACKOFF_SCHEDULE", (0.0,) * len(base_tool._BACKOFF_SCHEDULE))
+
+
+def _client(handler) -> httpx.Client:
+    return httpx.Client(transport=httpx.MockTransport(handler))
+
+
+def _down(calls):
+    def handler(request):
+        calls.append(request)
+        raise httpx.ConnectError("down", request=request)
+    return handler
+
+
+def test_exhausted_retries_map_to_503(no_delay):
+    calls = []
+    with base_tool.use_client(_client(_down(calls))):
+        with pytest.raises(OrchestratorException) as exc:
+            base_tool.call_mcp_search({"origin": "DEL", "destination": "RETRY"})
+
+    assert (exc.value.code, exc.value.status_code) == ("REMOTE_API_UNAVAILABLE", 503)
+    assert len(calls) == base_tool._MAX_RETRIES + 1
+
+
+def test_exhausted_retries_map_to_503_async(monkeypatch, no_delay):
+    calls = []
+    monkeypatch.setattr(base_tool, "_ASYNC_CLIENT", httpx.AsyncClient(transport=httpx.MockTransport(_down(calls))))
+
+    with pytest.raises(OrchestratorException) as exc:
+        asyncio.run(base_tool.call_mcp_search_async({"origin": "DEL", "destination": "RETRY_ASYNC"}))
+
+    assert (exc.value.code, exc.value.status_code) == ("REMOTE_API_UNAVAILABLE", 503)
+    assert len(calls) == base_tool._MAX_RETRIES + 1
+
+
+def test_breaker_opens_after_consecutive_failures(monkeypatch, no_delay):
+    monkeypatch.setattr(base_tool, "_MCP_BREAKER", pybreaker.CircuitBreaker(fail_max=2, reset_timeout=30))
+    calls = []
+
+    with base_tool.use_client(_client(_down(calls))):
+        codes = []
+        for i in range(4):
+            with pytest.raises(OrchestratorException) as exc:
+                base_tool.call_mcp_search({"origin": "DEL", "destination": f"X{i}"})
+            codes.append((exc.value.code, exc.value.status_code))
+
+    assert codes == [("REMOTE_API_UNAVAILABLE", 503)] * 4
+    assert len(calls) == 2 * (base_tool._MAX_RETRIES + 1)  # open circuit fails without touching the network
+
+
+def test_client_error_does_not_trip_breaker(monkeypatch, breaker):
+    breaker.fail_max = 1
+
+    with base_tool.use_client(_client(lambda r: httpx.Response(400, text="bad"))):
+        with pytest.raises(OrchestratorException) as exc:
+            base_tool.call_mcp_search({"origin": "DEL", "destination": "BAD"})
+
+    assert exc.value.code == "REMOTE_API_ERROR"
+    assert breaker.current_state == "closed"
+
+
+def test_breaker_does_not_serialize_concurrent_calls():
+    def slow(request):
+        time.sleep(0.3)
+        return httpx.Response(200, json=[])
+
+    client = _client(slow)
+
+    def search(i):
+        with base_tool.use_client(client):
+            return base_tool.call_mcp_search({"origin": "DEL", "destination": f"C{i}"})
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert list(pool.map(search, range(4))) == [[]] * 4
+    assert time.perf_counter() - start < 0.9  # serialized would take >= 1.2s
+
+
+def _search_both_paths(monkeypatch, handler, destination):
+    """Run the same failing search through the sync and async paths; return both exceptions."""
+    monkeypatch.setattr(base_tool, "_ASYNC_CLIENT", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    errors = []
+    with base_tool.use_client(_client(handler)):
+        with pytest.raises(OrchestratorException) as exc:
+            base_tool.call_mcp_search({"origin": "DEL", "destination": destination})
+        errors.append(exc.value)
+    with pytest.raises(OrchestratorException) as exc:
+        asyncio.run(base_tool.call_mcp_search_async({"origin": "DEL", "destination": destination + "_ASYNC"}))
+    errors.append(exc.value)
+    return errors
+
+
+def test_non_json_200_maps_to_502(monkeypatch):
+    errors = _search_both_paths(monkeypatch, lambda r: httpx.Response(200, text="<html>proxy</html>"), "HTML")
+    assert [(e.code, e.status_code) for e in errors] == [("REMOTE_API_ERROR", 502)] * 2
+
+
+def test_non_transport_http_error_maps_the_same_on_both_paths(monkeypatch):
+    def handler(request):
+        raise httpx.DecodingError("bad gzip", request=request)
+
+    errors = _search_both_paths(monkeypatch, handler, "DECODE")
+    assert [(e.code, e.status_code) for e in errors] == [("HTTP_UNEXPECTED_ERROR", 500)] * 2
+
+
+@pytest.mark.parametrize("body", [[{"price": 100}], {"flights": [{"price": 100}]}])
+def test_cache_hits_are_isolated_from_caller_mutation(body):
+    query = {"origin": "DEL", "destination": f"COPY_{type(body).__name__}"}
+    with base_tool.use_client(_client(lambda r: httpx.Response(200, json=body))):
+        first = base_tool.call_mcp_search(query)
+        (first[0] if isinstance(first, list) else first)["x"] = 1
+        second = base_tool.call_mcp_search(query)
+
+    assert second == body
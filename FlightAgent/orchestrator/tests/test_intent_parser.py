@@ -0,0 +1,42 @@
+from datetime import date, timedelta
+
+from intent_parser import detect_currency_from_text, parse_user_query
+
+
+def _next(weekday: int) -> str:
+    today = date.today()
+    return (today + timedelta(days=(weekday - today.weekday()) % 7)).isoformat()
+
+
+def test_weekday_follows_weekday_order_not_text_order():
+    query = parse_user_query("from delhi to dubai on friday or monday")
+    assert query["departDate"] == _next(0)
+
+
+def test_last_listed_airline_wins():
+    assert parse_user_query("indigo or emirates")["airline"] == "Indigo"
+    assert parse_user_query("emirates or indigo")["airline"] == "Indigo"
+
+
+def test_airline_is_substring_match():
+    query = parse_user_query("flights on indigos")
+    assert query["airline"] == "Indigo"
+    assert query["intent"] == "airline_filter"
+
+
+def test_under_without_amount_does_not_fall_through_to_over():
+    query = parse_user_query("cheap flights under budget, over 5000 reviews")
+    assert "maxPrice" not in query
+    assert "minPrice" not in query
+
+
+def test_price_bounds():
+    assert parse_user_query("flights under ₹5000")["maxPrice"] == 5000.0
+    assert parse_user_query("flights above 3000")["minPrice"] == 3000.0
+    query = parse_user_query("between 2000 and 4000")
+    assert (query["minPrice"], query["maxPrice"], query["intent"]) == (2000.0, 4000.0, "price_range")
+
+
+def test_currency_follows_currency_order():
+    assert detect_currency_from_text("pay in AED, not USD") == "USD"
+    assert detect_currency_from_text("no currency here") is None
@@ -0,0 +1,26 @@
+import asyncio
+
+import pytest
+
+from exceptions import OrchestratorException
+from tools.mcp_tool import aggregate_flight_search_tool
+
+
+@pytest.mark.parametrize(
+    "tool_input",
+    [
+        {"destination": "DXB"},
+        {"origin": "", "destination": "DXB"},
+        {"origin": "DEL", "destination": "DXB", "passengers": "two"},
+    ],
+)
+def test_invalid_input_maps_to_400(tool_input):
+    with pytest.raises(OrchestratorException) as exc:
+        aggregate_flight_search_tool.invoke(tool_input)
+    assert (exc.value.code, exc.value.status_code) == ("INVALID_FLIGHT_QUERY", 400)
+
+
+def test_invalid_input_maps_to_400_async():
+    with pytest.raises(OrchestratorException) as exc:
+        asyncio.run(aggregate_flight_search_tool.ainvoke({"destination": "DXB"}))
+    assert (exc.value.code, exc.value.status_code) == ("INVALID_FLIGHT_QUERY", 400)
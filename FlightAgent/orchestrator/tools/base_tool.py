@@ -1,12 +1,186 @@
 import os
-import time
+import copy
+import asyncio
+from random import random
 import logging
-import requests
-from typing import Dict, Any, Optional
+import orjson
+import httpx
+import pybreaker
+from threading import Lock
+from contextlib import contextmanager
+from contextvars import ContextVar
+from cachetools import TTLCache
+from tenacity import AsyncRetrying, Retrying, retry_if_exception_type, stop_after_attempt
+from typing import Dict, Any, Optional, List
 from exceptions import OrchestratorException
 
 logger = logging.getLogger("base_tool")
-logger.setLevel(logging.INFO)
+
+MCP_HOST = os.getenv("MCP_HOST", "http://localhost:8080")
+_MCP_URL = f"{MCP_HOST}/v1/search/flights"
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Exact-match cache of MCP search results keyed by the canonical query JSON.
+# Fares are time-sensitive, so keep the TTL short (MCP_CACHE_TTL seconds).
+MCP_CACHE_TTL = int(os.getenv("MCP_CACHE_TTL", "60"))
+_MCP_CACHE = TTLCache(maxsize=512, ttl=MCP_CACHE_TTL)
+_MCP_CACHE_LOCK = Lock()
+
+# Transport tuning, resolved once at import
+_MAX_RETRIES = int(os.getenv("MCP_MAX_RETRIES", "3"))
+_BASE_DELAY = float(os.getenv("MCP_BASE_DELAY", "1.0"))
+_TIMEOUT = float(os.getenv("MCP_TIMEOUT", "15"))
+
+# Statuses worth retrying (rate limiting / upstream unavailable)
+RETRYABLE_STATUSES = (429, 502, 503, 504)
+
+_HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+_HTTP_TIMEOUT = httpx.Timeout(_TIMEOUT, connect=3.0)
+
+# HTTP/2 clients: concurrent MCP calls are multiplexed over a single connection.
+# The sync client is resolved through a ContextVar so a task/agent context can swap in its own.
+_DEFAULT_CLIENT = httpx.Client(http2=True, headers=_JSON_HEADERS, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT)
+_CLIENT_VAR: ContextVar[httpx.Client] = ContextVar("mcp_client", default=_DEFAULT_CLIENT)
+_ASYNC_CLIENT = httpx.AsyncClient(http2=True, headers=_JSON_HEADERS, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT)
+
+
+class _RetryableStatus(Exception):
+    """Raised inside the retry loop for a RETRYABLE_STATUSES response."""
+    def __init__(self, response: httpx.Response):
+        self.response = response
+        super().__init__(f"HTTP {response.status_code}")
+
+
+# Sleep before retry n is _BACKOFF_SCHEDULE[n - 1], jittered and capped at _MAX_BACKOFF below
+_MAX_BACKOFF = 30.0
+_BACKOFF_SCHEDULE = tuple(_BASE_DELAY * (1 << i) for i in range(max(_MAX_RETRIES, 1)))
+
+
+def _retry_wait(retry_state) -> float:
+    """
+    Exponential backoff from _BACKOFF_SCHEDULE with ±20% jitter so concurrent callers
+    don't retry in lockstep; a numeric Retry-After takes precedence.
+    """
+    exc = retry_state.outcome.exception()
+    if isinstance(exc, _RetryableStatus):
+        retry_after = exc.response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), _MAX_BACKOFF)
+    # tenacity computes the wait before checking stop, so the final attempt's
+    # number runs one past the schedule; clamp rather than index out of range
+    step = _BACKOFF_SCHEDULE[min(retry_state.attempt_number, len(_BACKOFF_SCHEDULE)) - 1]
+    return min(step * (0.8 + 0.4 * random()), _MAX_BACKOFF)
+
+
+def _log_retry(retry_state) -> None:
+    logger.warning(
+        "⚠️ %s, retrying in %.1fs (attempt %d)...",
+        retry_state.outcome.exception(), retry_state.next_action.sleep, retry_state.attempt_number,
+    )
+
+
+# Shared retry policy for the sync and async paths: 1 attempt + _MAX_RETRIES retries
+_RETRY_POLICY = dict(
+    stop=stop_after_attempt(_MAX_RETRIES + 1),
+    wait=_retry_wait,
+    retry=retry_if_exception_type((httpx.TransportError, _RetryableStatus)),
+    before_sleep=_log_retry,
+    reraise=True,
+)
+
+
+# Fail fast while MCP is down: after 5 consecutive exhausted-retry failures, calls are
+# rejected for 30s instead of each waiting out the full retry schedule. Per process.
+# OrchestratorException (e.g. a 4xx from MCP) is a valid answer, not an outage.
+_MCP_BREAKER = pybreaker.CircuitBreaker(fail_max=5, reset_timeout=30, exclude=[OrchestratorException], name="mcp")
+
+
+def close_client():
+    """Close pooled connections; call on application shutdown."""
+    _DEFAULT_CLIENT.close()
+
+
+@contextmanager
+def use_client(client: httpx.Client):
+    """Route sync HTTP calls made in this context through `client` (tests, per-tenant auth)."""
+    token = _CLIENT_VAR.set(client)
+    try:
+        yield client
+    finally:
+        _CLIENT_VAR.reset(token)
+
+
+async def aclose_async_client():
+    """Close the async client's connections; call on application shutdown."""
+    await _ASYNC_CLIENT.aclose()
+
+
+def _check_status(response: httpx.Response) -> httpx.Response:
+    if response.status_code in RETRYABLE_STATUSES:
+        raise _RetryableStatus(response)
+    return response
+
+
+def _handle_response(url: str, response: httpx.Response) -> Any:
+    # ✅ Success
+    if response.status_code == 200:
+        logger.info("✅ Successful response received")
+        try:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError as e:
+            # e.g. an HTML error page from a proxy: a remote fault, not ours
+            logger.error("❌ Non-JSON 200 from %s: %s", url, e)
+            raise OrchestratorException(
+                message=f"Server returned invalid JSON: {e}",
+                code="REMOTE_API_ERROR",
+                status_code=502,
+            )
+
+    # ❌ Non-retryable errors
+    logger.error("❌ HTTP %d: %s", response.status_code, response.text)
+    raise OrchestratorException(
+        message=f"Server returned {response.status_code}: {response.text}",
+        code="REMOTE_API_ERROR",
+        status_code=response.status_code,
+    )
+
+
+def _unavailable(url: str, exc: Exception) -> OrchestratorException:
+    """Map a failure that persisted through all retries to a 503."""
+    if isinstance(exc, _RetryableStatus):
+        logger.error("❌ All retries exhausted for %s (HTTP %d)", url, exc.response.status_code)
+        message = f"Failed to reach {url}: server returned {exc.response.status_code} after retries."
+    elif isinstance(exc, httpx.TimeoutException):
+        logger.error("⏱ Timeout calling %s after retries: %s", url, exc)
+        message = f"Timed out reaching {url} after retries."
+    else:
+        logger.error("🌐 Failed to reach %s after retries (%s): %s", url, type(exc).__name__, exc)
+        message = f"Failed to reach {url} after retries."
+    return OrchestratorException(message=message, code="REMOTE_API_UNAVAILABLE", status_code=503)
+
+
+def _unexpected(url: str, exc: Exception) -> OrchestratorException:
+    """Remaining httpx failures (decoding, redirects, bad URL); anything else is a bug and propagates."""
+    logger.error("💥 %s calling %s: %s", type(exc).__name__, url, exc)
+    return OrchestratorException(message=f"Unexpected error: {str(exc)}", code="HTTP_UNEXPECTED_ERROR")
+
+
+def _circuit_open(url: str) -> OrchestratorException:
+    """Same 503 as exhausted retries, raised without attempting the call."""
+    logger.error("🚫 Circuit open for %s, failing fast", url)
+    return OrchestratorException(
+        message=f"Failed to reach {url}: service temporarily unavailable, retry shortly.",
+        code="REMOTE_API_UNAVAILABLE",
+        status_code=503,
+    )
+
+
+def _send_with_retry(client: httpx.Client, method: str, url: str, **kwargs) -> httpx.Response:
+    """Issue the request under _RETRY_POLICY; raises the last transport/status error when exhausted."""
+    for attempt in Retrying(**_RETRY_POLICY):
+        with attempt:
+            response = _check_status(client.request(method, url, **kwargs))
+    return response
 
 
 def call_http_with_retry(
@@ -14,21 +188,22 @@ def call_http_with_retry(
     payload: Optional[Dict[str, Any]] = None,
     method: str = "POST",
     headers: Optional[Dict[str, str]] = None,
-    max_retries: int = 3,
-    base_delay: float = 1.0,
-    timeout: int = 15,
+    *,
+    timeout: float = _TIMEOUT,
+    breaker: Optional[pybreaker.CircuitBreaker] = None,
 ) -> Dict[str, Any]:
     """
     Generic HTTP request wrapper with retry & exponential backoff.
+    Timeouts, transport errors and RETRYABLE_STATUSES are retried per _RETRY_POLICY.
 
     Args:
         url (str): The target API endpoint.
         payload (dict): The JSON body to send.
         method (str): HTTP method (POST or GET).
-        headers (dict): HTTP headers.
-        max_retries (int): Max retry attempts.
-        base_delay (float): Base delay before retry (doubles each time).
-        timeout (int): Timeout per request.
+        headers (dict): Extra HTTP headers (JSON content type is set on the client).
+        timeout (float): Timeout per request (MCP_TIMEOUT by default).
+        breaker (CircuitBreaker): Optional breaker around the retried call; while open,
+            fails immediately with REMOTE_API_UNAVAILABLE.
 
     Returns:
         dict: JSON response from server.
@@ -36,63 +211,116 @@ def call_http_with_retry(
     Raises:
         OrchestratorException: If retries exhausted or non-retryable error.
     """
-    if headers is None:
-        headers = {"Content-Type": "application/json"}
+    method = method.upper()
+    if method not in ("POST", "GET"):
+        raise OrchestratorException(f"Unsupported HTTP method: {method}", code="HTTP_UNEXPECTED_ERROR")
 
-    for attempt in range(1, max_retries + 1):
-        try:
-            logger.info(f"🌐 [{method}] {url} (Attempt {attempt}/{max_retries})")
-
-            if method.upper() == "POST":
-                response = requests.post(url, json=payload, headers=headers, timeout=timeout)
-            elif method.upper() == "GET":
-                response = requests.get(url, params=payload, headers=headers, timeout=timeout)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-
-            # ✅ Success
-            if response.status_code == 200:
-                logger.info("✅ Successful response received")
-                return response.json()
-
-            # ⚠️ Retryable errors
-            elif response.status_code in (429, 502, 503, 504):
-                wait = base_delay * (2 ** (attempt - 1))
-                logger.warning(f"⚠️ Server returned {response.status_code}, retrying in {wait:.1f}s...")
-                time.sleep(wait)
-                continue
-
-            # ❌ Non-retryable errors
-            else:
-                logger.error(f"❌ HTTP {response.status_code}: {response.text}")
-                raise OrchestratorException(
-                    message=f"Server returned {response.status_code}: {response.text}",
-                    code="REMOTE_API_ERROR",
-                    status_code=response.status_code,
-                )
-
-        except requests.exceptions.Timeout:
-            wait = base_delay * (2 ** (attempt - 1))
-            logger.warning(f"⏱ Timeout on attempt {attempt}, retrying in {wait:.1f}s...")
-            time.sleep(wait)
-            continue
-
-        except requests.exceptions.ConnectionError as e:
-            wait = base_delay * (2 ** (attempt - 1))
-            logger.warning(f"🌐 Connection error: {e}. Retrying in {wait:.1f}s...")
-            time.sleep(wait)
-            continue
-
-        except Exception as e:
-            logger.exception(f"💥 Unexpected error calling {url}: {e}")
-            raise OrchestratorException(
-                message=f"Unexpected error: {str(e)}",
-                code="HTTP_UNEXPECTED_ERROR"
-            )
+    client = _CLIENT_VAR.get()
+    if method == "POST":
+        body, params = (orjson.dumps(payload) if payload is not None else None), None
+    else:
+        body, params = None, payload
 
-    logger.error(f"❌ All retries exhausted for {url}")
-    raise OrchestratorException(
-        message=f"Failed to reach {url} after {max_retries} retries.",
-        code="REMOTE_API_UNAVAILABLE",
-        status_code=503
+    try:
+        logger.info("🌐 [%s] %s", method, url)
+        kwargs = dict(content=body, params=params, headers=headers, timeout=timeout)
+        if breaker is None:
+            response = _send_with_retry(client, method, url, **kwargs)
+        else:
+            # calling() records the outcome without holding the breaker's lock around the
+            # request (breaker.call would serialize every caller, retry sleeps included)
+            with breaker.calling():
+                response = _send_with_retry(client, method, url, **kwargs)
+
+    except pybreaker.CircuitBreakerError:
+        raise _circuit_open(url)
+
+    except (_RetryableStatus, httpx.TransportError) as e:
+        raise _unavailable(url, e)
+
+    except (httpx.HTTPError, httpx.InvalidURL) as e:
+        raise _unexpected(url, e)
+
+    return _handle_response(url, response)
+
+
+def _copy_results(results: Any) -> Any:
+    # callers tag/merge results in place, so never hand out the cached objects
+    if isinstance(results, list):
+        return [dict(r) if isinstance(r, dict) else r for r in results]
+    return copy.deepcopy(results)
+
+
+def call_mcp_search(flight_query: Dict[str, Any], *, timeout: float = _TIMEOUT) -> List[Dict[str, Any]]:
+    """
+    Calls MCP's /v1/search/flights endpoint for a single flight query.
+    Identical queries within MCP_CACHE_TTL seconds are served from an in-process cache.
+    Blocking — use call_mcp_search_async from async handlers.
+    While the MCP circuit breaker is open, fails immediately with REMOTE_API_UNAVAILABLE.
+    """
+
+    key = orjson.dumps(flight_query, option=orjson.OPT_SORT_KEYS)
+    with _MCP_CACHE_LOCK:
+        cached = _MCP_CACHE.get(key)
+    if cached is not None:
+        logger.info("♻️ MCP cache hit")
+        return _copy_results(cached)
+
+    results = call_http_with_retry(_MCP_URL, payload=flight_query, timeout=timeout, breaker=_MCP_BREAKER)
+    with _MCP_CACHE_LOCK:
+        _MCP_CACHE[key] = results
+    return _copy_results(results)
+
+
+async def _post_mcp_search(flight_query: Dict[str, Any], timeout: float) -> Any:
+    """
+    POST one query to MCP over the async client with the same retry policy as the
+    sync path; backoff waits with asyncio.sleep so no thread is held.
+    """
+    url = _MCP_URL
+    body = orjson.dumps(flight_query)  # encoded once, reused across retries
+    try:
+        with _MCP_BREAKER.calling():
+            async for attempt in AsyncRetrying(**_RETRY_POLICY):
+                with attempt:
+                    response = _check_status(await _ASYNC_CLIENT.post(url, content=body, timeout=timeout))
+
+    except pybreaker.CircuitBreakerError:
+        raise _circuit_open(url)
+
+    except (_RetryableStatus, httpx.TransportError) as e:
+        raise _unavailable(url, e)
+
+    except (httpx.HTTPError, httpx.InvalidURL) as e:
+        raise _unexpected(url, e)
+
+    return _handle_response(url, response)
+
+
+async def call_mcp_search_async(
+    flight_query: Dict[str, Any], *, timeout: float = _TIMEOUT
+) -> List[Dict[str, Any]]:
+    """Async counterpart of call_mcp_search; shares its result cache."""
+    key = orjson.dumps(flight_query, option=orjson.OPT_SORT_KEYS)
+    with _MCP_CACHE_LOCK:
+        cached = _MCP_CACHE.get(key)
+    if cached is not None:
+        logger.info("♻️ MCP cache hit")
+        return _copy_results(cached)
+
+    results = await _post_mcp_search(flight_query, timeout)
+    with _MCP_CACHE_LOCK:
+        _MCP_CACHE[key] = results
+    return _copy_results(results)
+
+
+async def call_mcp_search_many(queries: List[Dict[str, Any]], return_exceptions: bool = False) -> List[Any]:
+    """
+    Run several MCP searches concurrently over the shared async HTTP/2 client.
+    Results come back in the order of `queries`; with return_exceptions=True a failed
+    query yields its exception instead of aborting the whole batch.
+    """
+    return await asyncio.gather(
+        *(call_mcp_search_async(q) for q in queries),
+        return_exceptions=return_exceptions,
     )
@@ -1,98 +1,57 @@
 # tools/mcp_tool.py
-from langchain.tools import tool
-from tools.base_tool import call_mcp_search
-
-import os
-import time
 import logging
-import requests
 from typing import Dict, Any
-from langchain.tools import tool
+from pydantic import ValidationError
+from prometheus_client import Histogram
+from langchain.tools import StructuredTool
+from tools.base_tool import call_mcp_search, call_mcp_search_async
 from exceptions import OrchestratorException
+from models.flight_models import FlightQuery
 
 # --- Logger ---
-logger = logging.getLogger("mcp_tool")
-logger.setLevel(logging.INFO)
+logger = logging.getLogger(__name__)
 
-# --- Configuration ---
-MCP_HOST = os.getenv("MCP_HOST", "http://localhost:8080")
-MCP_FLIGHT_ENDPOINT = f"{MCP_HOST}/v1/search/flights"
+# --- Metrics ---
+MCP_RESULTS = Histogram(
+    "mcp_results",
+    "Flight results returned by MCP",
+    buckets=(0, 1, 5, 10, 20, 50, 100, 250, 500),
+)
 
 
-def _call_mcp_search_with_retry(flight_query: Dict[str, Any], max_retries: int = 3, base_delay: float = 1.0):
-    """
-    Calls MCP's /v1/search/flights endpoint with retries and exponential backoff.
-    Returns the JSON response from MCP or raises an OrchestratorException.
-    """
-    headers = {"Content-Type": "application/json"}
-
-    for attempt in range(1, max_retries + 1):
-        try:
-            logger.info(f"🚀 Calling MCP (Attempt {attempt}/{max_retries}) → {MCP_FLIGHT_ENDPOINT}")
-
-            response = requests.post(MCP_FLIGHT_ENDPOINT, json=flight_query, headers=headers, timeout=15)
-
-            # ✅ Handle successful response
-            if response.status_code == 200:
-                logger.info("✅ MCP responded successfully.")
-                return response.json()
-
-            # ⚠️ Handle retryable errors
-            elif response.status_code in (429, 502, 503, 504):
-                wait = base_delay * (2 ** (attempt - 1))
-                logger.warning(f"⚠️ MCP responded with {response.status_code}. Retrying in {wait:.1f}s...")
-                time.sleep(wait)
-                continue
-
-            # ❌ Non-retryable error
-            else:
-                error_body = response.text
-                logger.error(f"❌ MCP returned HTTP {response.status_code}: {error_body}")
-                raise OrchestratorException(
-                    message=f"MCP returned HTTP {response.status_code}: {error_body}",
-                    code="MCP_ERROR",
-                    status_code=response.status_code,
-                )
-
-        except requests.exceptions.Timeout:
-            wait = base_delay * (2 ** (attempt - 1))
-            logger.warning(f"⏱️ Timeout contacting MCP (attempt {attempt}). Retrying in {wait:.1f}s...")
-            time.sleep(wait)
-            continue
-
-        except requests.exceptions.ConnectionError as e:
-            wait = base_delay * (2 ** (attempt - 1))
-            logger.warning(f"🌐 MCP connection error: {e}. Retrying in {wait:.1f}s...")
-            time.sleep(wait)
-            continue
-
-        except Exception as e:
-            logger.exception(f"💥 Unexpected error calling MCP: {e}")
-            raise OrchestratorException(
-                message=f"Unexpected error while calling MCP: {str(e)}",
-                code="MCP_UNEXPECTED_ERROR",
-            )
-
-    # ❌ All retries exhausted
-    logger.error("❌ MCP service unreachable after retries.")
-    raise OrchestratorException(
-        message="MCP service not reachable after multiple retries.",
-        code="MCP_UNAVAILABLE",
-        status_code=503,
-    )
-
-
-# 🧠 LangChain @tool decorator — registered with the LLM agent
-@tool("aggregate_flight_search_tool", return_direct=True)
-def aggregate_flight_search_tool(flight_query: Dict[str, Any]) -> Dict[str, Any]:
+def _invalid_query(e: ValidationError) -> str:
+    """handle_validation_error hook: surface schema failures as a 400, not a raw ValidationError."""
+    raise OrchestratorException(f"Invalid flight query: {e}", code="INVALID_FLIGHT_QUERY", status_code=400)
+
+
+def _mcp_payload(flight_query: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop unset optional fields; the args are already validated against FlightQuery."""
+    logger.info("🧩 aggregate_flight_search_tool invoked with: %s", flight_query)
+
+    # Validation sanity check
+    if not flight_query.get("origin") or not flight_query.get("destination"):
+        raise OrchestratorException("Origin and destination are required", code="INVALID_FLIGHT_QUERY", status_code=400)
+
+    return {k: v for k, v in flight_query.items() if v is not None}
+
+
+def _record_results(response: Any) -> None:
+    if isinstance(response, (list, tuple)):
+        MCP_RESULTS.observe(len(response))
+        logger.info("✅ MCP returned %d results", len(response))
+    else:
+        logger.info("✅ MCP returned non-list response (%s)", type(response).__name__)
+
+
+def _search_flights(**flight_query: Any) -> Dict[str, Any]:
     """
     Tool for LangChain agent.
     Invokes the MCP microservice to fetch aggregated flight results using Amadeus API.
 
     Parameters
     ----------
-    flight_query : dict
-        Expected keys include:
+    **flight_query
+        Fields of FlightQuery, validated by the tool's args_schema:
           - origin (str)
           - destination (str)
           - departDate (str)
@@ -108,15 +67,26 @@ def aggregate_flight_search_tool(flight_query: Dict[str, Any]) -> Dict[str, Any]
     dict
         The JSON response from MCP containing a list of flight results.
     """
-    logger.info(f"🧩 aggregate_flight_search_tool invoked with: {flight_query}")
-
-    # Validation sanity check
-    if not flight_query.get("origin") or not flight_query.get("destination"):
-        raise OrchestratorException("Origin and destination are required", code="INVALID_FLIGHT_QUERY", status_code=400)
+    # Call MCP (retries, caching and circuit breaking handled in base_tool)
+    response = call_mcp_search(_mcp_payload(flight_query))
+    _record_results(response)
+    return response
 
-    # Call MCP with retry logic
-    response = _call_mcp_search_with_retry(flight_query)
 
-    logger.info(f"✅ MCP returned {len(response) if isinstance(response, list) else 'some'} results")
+async def _search_flights_async(**flight_query: Any) -> Dict[str, Any]:
+    """Async variant used by ainvoke: backoff waits on the event loop, not a worker thread."""
+    response = await call_mcp_search_async(_mcp_payload(flight_query))
+    _record_results(response)
     return response
 
+
+# 🧠 LangChain tool registered with the LLM agent (sync invoke + native async ainvoke).
+# args_schema makes LangChain validate the input once, at the tool boundary.
+aggregate_flight_search_tool = StructuredTool.from_function(
+    func=_search_flights,
+    coroutine=_search_flights_async,
+    name="aggregate_flight_search_tool",
+    args_schema=FlightQuery,
+    handle_validation_error=_invalid_query,
+    return_direct=True,
+)